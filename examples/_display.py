@@ -0,0 +1,18 @@
+"""
+Display helpers shared by the examples.
+"""
+
+_join_cache = {}
+
+
+def join_names(values):
+    """Join names for display, reusing the string for lists seen before.
+
+    Smogon sets list alternative moves as nested lists; those are shown as 'A / B'.
+    """
+    key = tuple(tuple(v) if isinstance(v, list) else v for v in values)
+    joined = _join_cache.get(key)
+    if joined is None:
+        joined = ', '.join(' / '.join(v) if isinstance(v, tuple) else v for v in key)
+        _join_cache[key] = joined
+    return joined
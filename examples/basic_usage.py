@@ -12,7 +12,7 @@ def main():
     
     # Initialize with specific formats
     print("\n1. Initializing PokemonData with specific formats...")
-    data = PokemonData(randbats_formats=['gen9randombattle', 'gen8randombattle'], auto_update=False)
+    data = PokemonData(randbats_formats=['gen9randombattle', 'gen8randombattle'])
     
     # Get available formats
     print(f"Available formats: {data.get_formats()}")
@@ -5,6 +5,8 @@ Comprehensive example demonstrating both RandBats and Smogon integration.
 
 from localsets import PokemonData, get_pokemon, get_smogon_sets
 
+from _display import join_names
+
 def main():
     """Demonstrate comprehensive package usage."""
     print("Pokemon Data Package - Comprehensive Example")
@@ -13,7 +15,7 @@ def main():
     # Initialize Pokemon data with both RandBats and Smogon
     print("\n1. RandBats Data (Random Battle)")
     print("-" * 30)
-    data = PokemonData(randbats_formats=['gen9randombattle'], smogon_formats=['gen9ou'], auto_update=False)
+    data = PokemonData(randbats_formats=['gen9randombattle'], smogon_formats=['gen9ou'])
     
     # Get Pokemon from RandBats
     pokemon_name = "pikachu"
@@ -21,9 +23,9 @@ def main():
     if randbats_pokemon:
         print(f"Found {pokemon_name} in gen9randombattle:")
         print(f"  Level: {randbats_pokemon.get('level', 'N/A')}")
-        print(f"  Abilities: {', '.join(randbats_pokemon.get('abilities', []))}")
-        print(f"  Items: {', '.join(randbats_pokemon.get('items', []))}")
-        print(f"  Moves: {', '.join(randbats_pokemon.get('moves', []))}")
+        print(f"  Abilities: {join_names(randbats_pokemon.get('abilities', ()))}")
+        print(f"  Items: {join_names(randbats_pokemon.get('items', ()))}")
+        print(f"  Moves: {join_names(randbats_pokemon.get('moves', ()))}")
     
     # Quick access to RandBats
     quick_randbats = get_pokemon(pokemon_name)
@@ -46,7 +48,7 @@ def main():
                 evs = set_data['evs']
                 ev_str = ', '.join([f"{stat}: {value}" for stat, value in evs.items()])
                 print(f"    EVs: {ev_str}")
-            print(f"    Moves: {', '.join(set_data.get('moves', []))}")
+            print(f"    Moves: {join_names(set_data.get('moves', ()))}")
     
     print("\n3. Package Information")
     print("-" * 30)
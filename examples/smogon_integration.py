@@ -5,6 +5,8 @@ Example demonstrating the Smogon integration in the Pokemon data package.
 
 from localsets import PokemonData, get_smogon_sets, get_pokemon
 
+from _display import join_names
+
 def main():
     print("=== Pokemon Data Package - Smogon Integration Example ===\n")
     
@@ -22,9 +24,9 @@ def main():
     if pikachu_randbats:
         print(f"Pikachu in gen9randombattle:")
         print(f"  Level: {pikachu_randbats.get('level', 'N/A')}")
-        print(f"  Abilities: {', '.join(pikachu_randbats.get('abilities', []))}")
-        print(f"  Items: {', '.join(pikachu_randbats.get('items', []))}")
-        print(f"  Moves: {', '.join(pikachu_randbats.get('moves', []))}")
+        print(f"  Abilities: {join_names(pikachu_randbats.get('abilities', ()))}")
+        print(f"  Items: {join_names(pikachu_randbats.get('items', ()))}")
+        print(f"  Moves: {join_names(pikachu_randbats.get('moves', ()))}")
     else:
         print("Pikachu not found in gen9randombattle")
     
@@ -44,7 +46,7 @@ def main():
                 evs = set_data['evs']
                 ev_str = ', '.join([f"{stat}: {value}" for stat, value in evs.items()])
                 print(f"    EVs: {ev_str}")
-            print(f"    Moves: {', '.join(set_data.get('moves', []))}")
+            print(f"    Moves: {join_names(set_data.get('moves', ()))}")
     else:
         print("Pikachu not found in gen9ou")
     
@@ -5,12 +5,27 @@ A Python package providing offline access to Pokemon random battle data
 with automatic updates from the official source repository.
 """
 
-from .core import PokemonData, RandBatsData
-from .formats import (
-    get_pokemon,  list_pokemon,
-    get_smogon_sets, list_smogon_pokemon
-)
-from .smogon import SmogonSets
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .core import PokemonData, RandBatsData
+    from .formats import (
+        get_pokemon,  list_pokemon,
+        get_smogon_sets, list_smogon_pokemon
+    )
+    from .smogon import SmogonSets
+
+# Exports are imported on first access, so importing the package (or
+# localsets.cli) does not load the data layer until it is used
+_LAZY_EXPORTS = {
+    'PokemonData': 'core',
+    'RandBatsData': 'core',
+    'SmogonSets': 'smogon',
+    'get_pokemon': 'formats',
+    'list_pokemon': 'formats',
+    'get_smogon_sets': 'formats',
+    'list_smogon_pokemon': 'formats',
+}
 
 __all__ = [
     'PokemonData',
@@ -20,4 +35,21 @@ __all__ = [
     'list_pokemon',
     'get_smogon_sets',
     'list_smogon_pokemon',
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name: str) -> Any:
+    # Resolve the version lazily so plain library imports don't pay for
+    # importlib.metadata; only the CLI's --version path needs it.
+    if name == '__version__':
+        from importlib.metadata import version, PackageNotFoundError
+        try:
+            return version('localsets')
+        except PackageNotFoundError:
+            return 'unknown'
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+        value = getattr(import_module(f'.{_LAZY_EXPORTS[name]}', __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
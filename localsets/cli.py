@@ -2,15 +2,41 @@
 Command line interface for localsets (standard library only).
 """
 
-import sys
 import argparse
 import json
-from localsets import __version__
-from localsets.core import PokemonData
+from typing import TYPE_CHECKING, Any, Sequence
+
+if TYPE_CHECKING:
+    from localsets.core import PokemonData
+
+def _dumps(obj: Any) -> str:
+    """Serialize obj as indented JSON, using orjson when it is installed."""
+    try:
+        import orjson
+    except ImportError:
+        return json.dumps(obj, indent=2)
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+def _get_data(refresh: bool = False) -> 'PokemonData':
+    """Return the process-wide PokemonData instance, reloading it if asked."""
+    from localsets.formats import _get_global_data, _reset_global_data
+    if refresh:
+        _reset_global_data()
+    return _get_global_data()
+
+def _print_pokemon_list(pokemon_list: Sequence[str], format_name: str, chunk_size: int = 5) -> None:
+    """Print Pokemon names in comma-separated rows of chunk_size."""
+    if not pokemon_list:
+        print(f"No Pokemon found in {format_name}")
+        return
+    # Build the whole listing first so it goes out in a single write
+    rows = '\n'.join(', '.join(pokemon_list[i:i + chunk_size]) for i in range(0, len(pokemon_list), chunk_size))
+    print(f"Pokemon in {format_name}:\n{rows}\nTotal: {len(pokemon_list)} Pokemon")
 
 def main_cli():
     parser = argparse.ArgumentParser(description="localsets minimal CLI")
     parser.add_argument('--version', action='store_true', help='Show version and exit')
+    parser.add_argument('--refresh', action='store_true', help='Reload bundled data instead of reusing the loaded copy')
     subparsers = parser.add_subparsers(dest='command')
 
     rb = subparsers.add_parser('randbats', help='Search random battle sets')
@@ -21,33 +47,44 @@ def main_cli():
     sm.add_argument('species', help='Pokemon species or ID')
     sm.add_argument('--format', help='Battle format (optional)')
 
+    ls = subparsers.add_parser('list', help='List Pokemon in a format')
+    ls.add_argument('format', help='RandBats or Smogon format name')
+
     args = parser.parse_args()
     if args.version:
+        from localsets import __version__
         print(f"localsets version {__version__}")
         return
     if args.command is None:
+        from localsets import __version__
         print(f"localsets CLI is installed and working! Version: {__version__}")
         print("Try 'localsets randbats <species>' or 'localsets smogon <species>'")
         return
-    data = PokemonData()
+    data = _get_data(refresh=args.refresh)
     if args.command == 'randbats':
         if args.format:
             result = data.get_randbats(args.species, args.format)
-            print(json.dumps(result, indent=2) if result else f"No data found for {args.species} in {args.format}")
+            print(_dumps(result) if result else f"No data found for {args.species} in {args.format}")
         else:
             results = {}
             for fmt in data.get_randbats_formats():
                 res = data.get_randbats(args.species, fmt)
                 if res:
                     results[fmt] = res
-            print(json.dumps(results, indent=2) if results else f"No data found for {args.species}")
+            print(_dumps(results) if results else f"No data found for {args.species}")
     elif args.command == 'smogon':
         if args.format:
             result = data.get_smogon_sets(args.species, args.format)
-            print(json.dumps(result, indent=2) if result else f"No data found for {args.species} in {args.format}")
+            print(_dumps(result) if result else f"No data found for {args.species} in {args.format}")
         else:
             results = data.search_smogon(args.species)
-            print(json.dumps(results, indent=2) if results else f"No data found for {args.species}")
+            print(_dumps(results) if results else f"No data found for {args.species}")
+    elif args.command == 'list':
+        if args.format in data.get_randbats_formats():
+            pokemon_list = data.list_randbats_pokemon(args.format)
+        else:
+            pokemon_list = data.list_smogon_pokemon(args.format)
+        _print_pokemon_list(pokemon_list, args.format)
 
 if __name__ == "__main__":
     main_cli() 
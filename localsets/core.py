@@ -3,16 +3,26 @@ Core PokemonData class for managing Pokemon random battle data.
 """
 
 import os
+import sys
 import json
+import heapq
 import logging
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Any, Callable, Dict, KeysView, List, Optional, Tuple, Union
 from .updater import DataReader
-from .formats import FORMATS, FORMAT_MAPPINGS
+from .formats import FORMATS, FORMAT_MAPPINGS, _normalize_name
 from .smogon import SmogonSets
 
 logger = logging.getLogger(__name__)
 
+# Format auto-detection tries these first, then the newest other format
+_DETECT_PREFERENCE = ['gen9randombattle', 'gen8randombattle', 'gen7randombattle']
+_DETECT_ORDER = _DETECT_PREFERENCE + [f for f in reversed(FORMATS) if f not in _DETECT_PREFERENCE]
+
+# Entries kept in each per-instance lookup memo before it is emptied
+_MEMO_SIZE = 4096
+
 class PokemonData:
     """
     Main class for managing Pokemon data from both RandBats and Smogon sources.
@@ -20,13 +30,15 @@ class PokemonData:
     """
     def __init__(self, randbats_formats: Optional[List[str]] = None, 
                  smogon_formats: Optional[List[str]] = None,
-                 cache_dir: Optional[str] = None):
+                 cache_dir: Optional[str] = None,
+                 eager: bool = False):
         """
         Initialize PokemonData instance.
         Args:
             randbats_formats: List of RandBats format names to load. If None, loads all available.
             smogon_formats: List of Smogon format names to load. If None, loads all available.
-            cache_dir: Directory to store cached data. If None, uses default.
+            cache_dir: Directory to store pickled copies of parsed data files. If None, nothing is cached.
+            eager: Load every RandBats format now instead of on first access.
         """
         self.randbats_formats = randbats_formats or FORMATS
         self.smogon_formats = smogon_formats or []
@@ -34,37 +46,102 @@ class PokemonData:
         # RandBats data storage
         self._randbats_data: Dict[str, Dict] = {}
         self._loaded_randbats_formats: set = set()
+        # Formats not read from disk yet; each loads the first time it is needed
+        self._pending_randbats_formats: set = set(self.randbats_formats)
+        # Serializes lazy loads so no thread sees a format half stored or indexed
+        self._load_lock = threading.Lock()
+        # Pokemon per loaded format and their sum, kept current for get_cache_info
+        self._randbats_counts: Dict[str, int] = {}
+        self._total_randbats_pokemon = 0
+        # Normalized Pokemon name -> {format: data}, built as formats load
+        self._randbats_index: Dict[str, Dict[str, Dict]] = {}
+        # format -> item -> Pokemon sorted by item probability, filled on first query
+        self._top_users: Dict[str, Dict[str, List[tuple]]] = {}
+        # Per-instance memos for the lookup hot path, cleared whenever a format loads.
+        # Plain dicts hold no reference back to self, so a dropped instance is freed at once.
+        self._lookup_memo: Dict[Tuple[str, str], Optional[Dict[str, Any]]] = {}
+        self._detect_memo: Dict[str, str] = {}
+        # Odd while a format is loading; a result is memoized only if this stayed even and unchanged
+        self._load_generation = 0
         # Smogon data storage
-        self._smogon_data = SmogonSets(self.smogon_formats)
+        self._smogon_data = SmogonSets(self.smogon_formats, self.cache_dir)
         # Data reader for offline data
-        self.data_reader = DataReader(Path(__file__).parent / "randbattle_data")
-        self.metadata_reader = DataReader(Path(__file__).parent / "metadata")
-        # Load RandBats data
-        self._load_randbats_data()
+        self.data_reader = DataReader(Path(__file__).parent / "randbattle_data", self.cache_dir)
+        self.metadata_reader = DataReader(Path(__file__).parent / "metadata", self.cache_dir)
+        if eager:
+            self._load_randbats_data()
 
-    def _load_randbats_data(self):
-        """Load RandBats data for all specified formats."""
+    def _load_randbats_data(self) -> None:
+        """Load RandBats data for all specified formats that are not loaded yet."""
         for format_name in self.randbats_formats:
-            if format_name not in self._loaded_randbats_formats:
-                self._load_randbats_format(format_name)
-
-    def _load_randbats_format(self, format_name: str):
+            self._ensure_randbats_loaded(format_name)
+
+    def _ensure_randbats_loaded(self, format_name: str) -> None:
+        """Load a specified RandBats format on first access; safe to call from several threads."""
+        if format_name not in self._pending_randbats_formats:
+            return
+        with self._load_lock:
+            # Another thread may have finished loading it while this one waited
+            if format_name in self._pending_randbats_formats:
+                self._load_generation += 1
+                try:
+                    self._load_randbats_format(format_name)
+                    # Only now is the format stored and indexed, so it can stop being pending
+                    self._pending_randbats_formats.discard(format_name)
+                finally:
+                    self._lookup_memo.clear()
+                    self._detect_memo.clear()
+                    self._load_generation += 1
+
+    def _memoized(self, memo: Dict[Any, Any], key: Any, func: Callable[..., Any], *args: Any) -> Any:
+        """Return memo[key], computing func(*args) on a miss and storing it only if no load overlapped."""
+        try:
+            return memo[key]
+        except KeyError:
+            pass
+        generation = self._load_generation
+        value = func(*args)
+        if generation % 2 == 0:
+            with self._load_lock:
+                # Unchanged under the lock means no load started or finished during func
+                if generation == self._load_generation:
+                    if len(memo) >= _MEMO_SIZE:
+                        memo.clear()
+                    memo[key] = value
+        return value
+
+    def _load_randbats_format(self, format_name: str) -> None:
         """Load RandBats data for a specific format from bundled data only."""
         try:
             data = self.data_reader.get_format_data(format_name)
             if data is not None:
-                self._randbats_data[format_name] = data
-                self._loaded_randbats_formats.add(format_name)
+                self._set_randbats_data(format_name, data)
+                self._index_randbats_format(format_name, data)
                 logger.debug(f"Loaded {format_name} from bundled data")
                 return
             # Create empty data if nothing available
-            self._randbats_data[format_name] = {}
-            self._loaded_randbats_formats.add(format_name)
+            self._set_randbats_data(format_name, {})
             logger.warning(f"No data available for {format_name} - file not found in bundled data")
         except Exception as e:
             logger.error(f"Failed to load {format_name}: {e}")
-            self._randbats_data[format_name] = {}
-            self._loaded_randbats_formats.add(format_name)
+            self._set_randbats_data(format_name, {})
+
+    def _set_randbats_data(self, format_name: str, data: Dict[str, Any]) -> None:
+        """Store a format's data and update the Pokemon counts."""
+        self._randbats_data[format_name] = data
+        self._loaded_randbats_formats.add(format_name)
+        count = len(data)
+        self._total_randbats_pokemon += count - self._randbats_counts.get(format_name, 0)
+        self._randbats_counts[format_name] = count
+
+    def _index_randbats_format(self, format_name: str, data: Dict[str, Any]) -> None:
+        """Add a format's Pokemon to the normalized-name index used for lookups."""
+        for key, entry in data.items():
+            name = sys.intern(self._normalize_name(key))
+            formats = self._randbats_index.setdefault(name, {})
+            # An exact normalized key wins over a fuzzy match, as in get_randbats
+            if key == name or format_name not in formats:
+                formats[format_name] = entry
 
     # RandBats methods (existing API)
     def get_randbats(self, pokemon_name: str, format_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
@@ -77,21 +154,20 @@ class PokemonData:
             Pokemon data dictionary or None if not found
         """
         if format_name is None:
-            format_name = self._detect_randbats_format(pokemon_name)
+            format_name = self._memoized(self._detect_memo, pokemon_name,
+                                         self._detect_randbats_format, pokemon_name)
+        self._ensure_randbats_loaded(format_name)
         if format_name not in self._randbats_data:
             logger.warning(f"Format {format_name} not available")
             return None
-        # Normalize Pokemon name
-        pokemon_name = self._normalize_name(pokemon_name)
-        # Search in format data
-        format_data = self._randbats_data[format_name]
-        if pokemon_name in format_data:
-            return format_data[pokemon_name]
-        # Try fuzzy matching
-        for key in format_data.keys():
-            if self._normalize_name(key) == pokemon_name:
-                return format_data[key]
-        return None
+        return self._memoized(self._lookup_memo, (pokemon_name, format_name),
+                              self._lookup_randbats, pokemon_name, format_name)
+
+    def _lookup_randbats(self, pokemon_name: str, format_name: str) -> Optional[Dict[str, Any]]:
+        """Find a Pokemon in a loaded format; memoized per instance by get_randbats."""
+        # Names were normalized once at load time, so this is a single lookup
+        name = self._normalize_name(pokemon_name)
+        return self._randbats_index.get(name, {}).get(format_name)
 
     def list_randbats_pokemon(self, format_name: str) -> List[str]:
         """
@@ -101,14 +177,30 @@ class PokemonData:
         Returns:
             List of Pokemon names
         """
+        return list(self.iter_randbats_pokemon(format_name))
+
+    def iter_randbats_pokemon(self, format_name: str) -> KeysView[str]:
+        """
+        View the Pokemon available in a RandBats format without copying them into a list.
+        Args:
+            format_name: Battle format name
+        Returns:
+            Live view of the Pokemon names; supports iteration, len() and fast membership tests
+        """
+        self._ensure_randbats_loaded(format_name)
         if format_name not in self._randbats_data:
             logger.warning(f"Format {format_name} not available")
-            return []
-        return list(self._randbats_data[format_name].keys())
+            return {}.keys()
+        return self._randbats_data[format_name].keys()
+
+    def count_randbats_pokemon(self, format_name: str) -> int:
+        """Count the Pokemon in a RandBats format without building a list of their names."""
+        self._ensure_randbats_loaded(format_name)
+        return self._randbats_counts.get(format_name, 0)
 
     def get_randbats_formats(self) -> List[str]:
         """Get list of available RandBats formats."""
-        return list(self._loaded_randbats_formats)
+        return list(self._loaded_randbats_formats | self._pending_randbats_formats)
 
     # Smogon methods (new API)
     def get_smogon_sets(self, pokemon_name: str, format_name: str) -> Optional[Dict[str, Any]]:
@@ -136,6 +228,9 @@ class PokemonData:
     def list_pokemon(self, format_name: str) -> List[str]:
         return self.list_randbats_pokemon(format_name)
 
+    def iter_pokemon(self, format_name: str) -> KeysView[str]:
+        return self.iter_randbats_pokemon(format_name)
+
     def get_formats(self) -> List[str]:
         return self.get_randbats_formats()
 
@@ -146,28 +241,26 @@ class PokemonData:
         }
 
     def search_all(self, pokemon_name: str) -> Dict[str, Any]:
-        results = {
-            'randbats': {},
-            'smogon': {}
+        self._load_randbats_data()
+        name = self._normalize_name(pokemon_name)
+        randbats = {fmt: data for fmt, data in self._randbats_index.get(name, {}).items() if data}
+        return {
+            'randbats': randbats,
+            'smogon': self.search_smogon(pokemon_name)
         }
-        for format_name in self._loaded_randbats_formats:
-            data = self.get_randbats(pokemon_name, format_name)
-            if data:
-                results['randbats'][format_name] = data
-        results['smogon'] = self.search_smogon(pokemon_name)
-        return results
 
     def _detect_randbats_format(self, pokemon_name: str) -> str:
-        recent_formats = ['gen9randombattle', 'gen8randombattle', 'gen7randombattle']
-        for format_name in recent_formats:
-            if format_name in self._randbats_data:
-                pokemon_data = self.get_randbats(pokemon_name, format_name)
-                if pokemon_data:
-                    return format_name
+        # Load formats in preference order only until one has the Pokemon
+        name = self._normalize_name(pokemon_name)
+        for format_name in _DETECT_ORDER:
+            self._ensure_randbats_loaded(format_name)
+            if self._randbats_index.get(name, {}).get(format_name):
+                return format_name
+        self._load_randbats_data()
         return next(iter(self._loaded_randbats_formats), 'gen9randombattle')
 
     def _normalize_name(self, name: str) -> str:
-        return ''.join(c for c in name.lower() if c.isalnum())
+        return _normalize_name(name)
 
     def get_randbats_metadata(self, format_name: str) -> Optional[Dict[str, Any]]:
         try:
@@ -181,11 +274,13 @@ class PokemonData:
         return self._smogon_data.get_format_info(format_name)
 
     def get_cache_info(self) -> Dict[str, Any]:
+        # Describes what is loaded so far; formats still pending are not read for this
         info = {
+            'cache_dir': str(self.cache_dir) if self.cache_dir else None,
             'randbats_formats': list(self._loaded_randbats_formats),
             'smogon_formats': self.get_smogon_formats(),
-            'total_randbats_pokemon': sum(len(data) for data in self._randbats_data.values()),
-            'randbats_format_counts': {fmt: len(data) for fmt, data in self._randbats_data.items()}
+            'total_randbats_pokemon': self._total_randbats_pokemon,
+            'randbats_format_counts': dict(self._randbats_counts)
         }
         return info
 
@@ -195,9 +290,13 @@ class PokemonData:
         Returns the role name with the highest weight, or None if not found.
         """
         data = self.get_randbats(pokemon_name, format_name)
-        if not data or 'stats' not in data or 'roles' not in data['stats']:
+        if not data or 'stats' not in data:
             return None
-        roles = data['stats']['roles']
+        return self._top_role(data['stats'])
+
+    def _top_role(self, stats: Dict[str, Any]) -> Optional[str]:
+        """Return the highest-weight role from an already fetched stats dict."""
+        roles = stats.get('roles')
         if not roles:
             return None
         # Find role with highest weight
@@ -211,14 +310,15 @@ class PokemonData:
         data = self.get_randbats(pokemon_name, format_name)
         if not data or 'stats' not in data:
             return None
+        stats = data['stats']
         if role:
-            roles = data['stats'].get('roles', {})
-            if role in roles and 'items' in roles[role]:
-                items = roles[role]['items']
+            role_stats = stats.get('roles', {}).get(role)
+            if role_stats:
+                items = role_stats.get('items')
                 if items:
                     return max(items.items(), key=lambda x: x[1])[0]
         # Fallback to top-level items
-        items = data['stats'].get('items', {})
+        items = stats.get('items', {})
         if items:
             return max(items.items(), key=lambda x: x[1])[0]
         return None
@@ -231,14 +331,15 @@ class PokemonData:
         data = self.get_randbats(pokemon_name, format_name)
         if not data or 'stats' not in data:
             return None
+        stats = data['stats']
         if role:
-            roles = data['stats'].get('roles', {})
-            if role in roles and 'abilities' in roles[role]:
-                abilities = roles[role]['abilities']
+            role_stats = stats.get('roles', {}).get(role)
+            if role_stats:
+                abilities = role_stats.get('abilities')
                 if abilities:
                     return max(abilities.items(), key=lambda x: x[1])[0]
         # Fallback to top-level abilities
-        abilities = data['stats'].get('abilities', {})
+        abilities = stats.get('abilities', {})
         if abilities:
             return max(abilities.items(), key=lambda x: x[1])[0]
         return None
@@ -251,21 +352,16 @@ class PokemonData:
         data = self.get_randbats(pokemon_name, format_name)
         if not data or 'stats' not in data:
             return None
-        if role:
-            roles = data['stats'].get('roles', {})
-            if role in roles and 'teraTypes' in roles[role]:
-                teras = roles[role]['teraTypes']
-                if teras:
-                    return max(teras.items(), key=lambda x: x[1])[0]
+        stats = data['stats']
+        roles = stats.get('roles', {})
         # If no role specified, get the most likely role and use its tera types
         if not role:
-            most_likely_role = self.get_most_likely_role(pokemon_name, format_name)
-            if most_likely_role:
-                roles = data['stats'].get('roles', {})
-                if most_likely_role in roles and 'teraTypes' in roles[most_likely_role]:
-                    teras = roles[most_likely_role]['teraTypes']
-                    if teras:
-                        return max(teras.items(), key=lambda x: x[1])[0]
+            role = self._top_role(stats)
+        role_stats = roles.get(role) if role else None
+        if role_stats:
+            teras = role_stats.get('teraTypes')
+            if teras:
+                return max(teras.items(), key=lambda x: x[1])[0]
         return None
 
     def get_most_likely_moves(self, pokemon_name: str, format_name: Optional[str] = None, role: Optional[str] = None, top_n: int = 4) -> Optional[List[str]]:
@@ -276,23 +372,43 @@ class PokemonData:
         data = self.get_randbats(pokemon_name, format_name)
         if not data or 'stats' not in data:
             return None
+        stats = data['stats']
+        roles = stats.get('roles', {})
         moves = None
-        if role:
-            roles = data['stats'].get('roles', {})
-            if role in roles and 'moves' in roles[role]:
-                moves = roles[role]['moves']
+        if role and role in roles:
+            moves = roles[role].get('moves')
         # If no role specified, get the most likely role and use its moves
         if moves is None:
-            most_likely_role = self.get_most_likely_role(pokemon_name, format_name)
-            if most_likely_role:
-                roles = data['stats'].get('roles', {})
-                if most_likely_role in roles and 'moves' in roles[most_likely_role]:
-                    moves = roles[most_likely_role]['moves']
+            most_likely_role = self._top_role(stats)
+            if most_likely_role and most_likely_role in roles:
+                moves = roles[most_likely_role].get('moves')
         if not moves:
             return None
-        # Sort moves by weight, descending, and return top_n
-        sorted_moves = sorted(moves.items(), key=lambda x: x[1], reverse=True)
-        return [move for move, _ in sorted_moves[:top_n]]
+        # Take the top_n moves by weight without sorting the whole dict
+        top_moves = heapq.nlargest(top_n, moves.items(), key=lambda x: x[1])
+        return [move for move, _ in top_moves]
+
+    def get_top_users_by_item(self, item_name: str, format_name: str, top_n: int = 10) -> List[tuple]:
+        """
+        Get the Pokémon most likely to carry an item in a given RandBats format.
+        Returns up to top_n (pokemon_name, probability) pairs, highest probability first.
+        The first query for a format ranks every item in one pass; later queries are lookups.
+        """
+        rankings = self._top_users.get(format_name)
+        if rankings is None:
+            self._ensure_randbats_loaded(format_name)
+            if format_name not in self._randbats_data:
+                logger.warning(f"Format {format_name} not available")
+                return []
+            rankings = {}
+            for pokemon_name, data in self._randbats_data[format_name].items():
+                for item, prob in data.get('stats', {}).get('items', {}).items():
+                    if prob:
+                        rankings.setdefault(item, []).append((pokemon_name, prob))
+            for users in rankings.values():
+                users.sort(key=lambda x: x[1], reverse=True)
+            self._top_users[format_name] = rankings
+        return rankings.get(item_name, [])[:top_n]
 
     def get_randbats_ivs(self, pokemon_name: str, format_name: Optional[str] = None, role: Optional[str] = None) -> dict:
         """
@@ -303,15 +419,16 @@ class PokemonData:
         data = self.get_randbats(pokemon_name, format_name)
         if not data or 'stats' not in data:
             return default_ivs.copy()
-        roles = data['stats'].get('roles', {})
+        stats = data['stats']
+        roles = stats.get('roles', {})
         if not role:
-            role = self.get_most_likely_role(pokemon_name, format_name)
-        if role and role in roles and 'ivs' in roles[role]:
-            ivs = roles[role]['ivs']
+            role = self._top_role(stats)
+        ivs = roles[role].get('ivs') if role and role in roles else None
+        if ivs is not None:
             return {stat: ivs.get(stat, 31) for stat in default_ivs}
         # fallback to top-level ivs if present
-        if 'ivs' in data['stats']:
-            ivs = data['stats']['ivs']
+        ivs = stats.get('ivs')
+        if ivs is not None:
             return {stat: ivs.get(stat, 31) for stat in default_ivs}
         return default_ivs.copy()
 
@@ -324,15 +441,16 @@ class PokemonData:
         data = self.get_randbats(pokemon_name, format_name)
         if not data or 'stats' not in data:
             return default_evs.copy()
-        roles = data['stats'].get('roles', {})
+        stats = data['stats']
+        roles = stats.get('roles', {})
         if not role:
-            role = self.get_most_likely_role(pokemon_name, format_name)
-        if role and role in roles and 'evs' in roles[role]:
-            evs = roles[role]['evs']
+            role = self._top_role(stats)
+        evs = roles[role].get('evs') if role and role in roles else None
+        if evs is not None:
             return {stat: evs.get(stat, 85) for stat in default_evs}
         # fallback to top-level evs if present
-        if 'evs' in data['stats']:
-            evs = data['stats']['evs']
+        evs = stats.get('evs')
+        if evs is not None:
             return {stat: evs.get(stat, 85) for stat in default_evs}
         return default_evs.copy()
 
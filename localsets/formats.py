@@ -2,7 +2,11 @@
 Format definitions and utility functions for Pokemon random battle data.
 """
 
-from typing import Dict, List, Optional, Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Optional, Any, Tuple
+
+if TYPE_CHECKING:
+    from .core import PokemonData
 
 # Available RandBats formats
 RANDBATS_FORMATS = [
@@ -108,8 +112,12 @@ COMBINED_FORMAT_MAPPINGS = {
 FORMATS = RANDBATS_FORMATS
 FORMAT_MAPPINGS = RANDBATS_FORMAT_MAPPINGS
 
+# Constant-time membership tests for the fixed format lists
+_RANDBATS_FORMAT_SET = frozenset(RANDBATS_FORMATS)
+_SMOGON_FORMAT_SET = frozenset(SMOGON_FORMATS)
+
 # Global PokemonData instance for quick access functions
-_global_data = None
+_global_data: Optional['PokemonData'] = None
 
 __all__ = [
     # Format lists
@@ -142,7 +150,7 @@ __all__ = [
 ]
 
 
-def _get_global_data():
+def _get_global_data() -> 'PokemonData':
     """Get or create global PokemonData instance."""
     global _global_data
     if _global_data is None:
@@ -152,6 +160,12 @@ def _get_global_data():
     return _global_data
 
 
+def _reset_global_data() -> None:
+    """Drop the global PokemonData instance so the next access reloads it."""
+    global _global_data
+    _global_data = None
+
+
 def get_pokemon(pokemon_name: str, format_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
     """
     Quick access function to get Pokemon data (RandBats).
@@ -262,16 +276,22 @@ def resolve_randbats_formats(formats: List[str]) -> List[str]:
     Returns:
         List of resolved format names
     """
+    return list(_resolve_randbats_formats(tuple(formats)))
+
+
+@lru_cache(maxsize=128)
+def _resolve_randbats_formats(formats: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Cached implementation of resolve_randbats_formats keyed on a tuple."""
     resolved = []
     for fmt in formats:
         if fmt in RANDBATS_FORMAT_MAPPINGS:
             resolved.extend(RANDBATS_FORMAT_MAPPINGS[fmt])
-        elif fmt in RANDBATS_FORMATS:
+        elif fmt in _RANDBATS_FORMAT_SET:
             resolved.append(fmt)
         else:
             # Unknown format, skip
             continue
-    return list(set(resolved))  # Remove duplicates
+    return tuple(dict.fromkeys(resolved))  # Remove duplicates, keeping order
 
 
 def resolve_smogon_formats(formats: List[str]) -> List[str]:
@@ -284,16 +304,22 @@ def resolve_smogon_formats(formats: List[str]) -> List[str]:
     Returns:
         List of resolved format names
     """
+    return list(_resolve_smogon_formats(tuple(formats)))
+
+
+@lru_cache(maxsize=128)
+def _resolve_smogon_formats(formats: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Cached implementation of resolve_smogon_formats keyed on a tuple."""
     resolved = []
     for fmt in formats:
         if fmt in SMOGON_FORMAT_MAPPINGS:
             resolved.extend(SMOGON_FORMAT_MAPPINGS[fmt])
-        elif fmt in SMOGON_FORMATS:
+        elif fmt in _SMOGON_FORMAT_SET:
             resolved.append(fmt)
         else:
             # Unknown format, skip
             continue
-    return list(set(resolved))  # Remove duplicates
+    return tuple(dict.fromkeys(resolved))  # Remove duplicates, keeping order
 
 
 def get_randbats_format_info(format_name: str) -> Dict[str, Any]:
@@ -306,20 +332,21 @@ def get_randbats_format_info(format_name: str) -> Dict[str, Any]:
     Returns:
         Dictionary with format information
     """
-    if format_name not in RANDBATS_FORMATS:
+    meta = _RANDBATS_FORMAT_META.get(format_name)
+    if meta is None:
         return {}
     
     info = {
         'name': format_name,
-        'generation': _extract_generation(format_name),
-        'type': _extract_randbats_type(format_name),
+        'generation': meta[0],
+        'type': meta[1],
         'available': True
     }
     
     # Add Pokemon count if data is loaded
     data = _get_global_data()
-    if format_name in data._randbats_data:
-        info['pokemon_count'] = len(data._randbats_data[format_name])
+    if format_name in data.get_randbats_formats():
+        info['pokemon_count'] = data.count_randbats_pokemon(format_name)
     
     return info
 
@@ -334,13 +361,14 @@ def get_smogon_format_info(format_name: str) -> Dict[str, Any]:
     Returns:
         Dictionary with format information
     """
-    if format_name not in SMOGON_FORMATS:
+    meta = _SMOGON_FORMAT_META.get(format_name)
+    if meta is None:
         return {}
     
     info = {
         'name': format_name,
-        'generation': _extract_generation(format_name),
-        'type': _extract_smogon_type(format_name),
+        'generation': meta[0],
+        'type': meta[1],
         'available': True
     }
     
@@ -352,6 +380,33 @@ def get_smogon_format_info(format_name: str) -> Dict[str, Any]:
     return info
 
 
+# Every non-alphanumeric ASCII byte, deleted with bytes.translate
+_ASCII_NON_ALNUM = bytes(c for c in range(128) if not chr(c).isalnum())
+
+
+class _NonAlnumDropTable(dict):
+    """str.translate table deleting non-alphanumerics, filled in as code points are seen."""
+
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        value = codepoint if chr(codepoint).isalnum() else None
+        self[codepoint] = value
+        return value
+
+
+_DROP_NON_ALNUM = _NonAlnumDropTable()
+
+
+# The set of Pokemon names is small, so repeated lookups hit this memo
+@lru_cache(maxsize=4096)
+def _normalize_name(name: str) -> str:
+    """Normalize a Pokemon name for comparison: lowercase alphanumerics only."""
+    name = name.lower()
+    if name.isascii():
+        # Filter in one C pass; bytes.translate with a delete set is the cheapest route
+        return name.encode('ascii').translate(None, _ASCII_NON_ALNUM).decode('ascii')
+    return name.translate(_DROP_NON_ALNUM)
+
+
 def _extract_generation(format_name: str) -> str:
     """Extract generation from format name."""
     if format_name.startswith('gen'):
@@ -392,4 +447,13 @@ def _extract_smogon_type(format_name: str) -> str:
     elif 'ubers' in format_name:
         return 'ubers'
     else:
-        return 'other' 
\ No newline at end of file
+        return 'other'
+
+
+# The format lists are fixed, so their (generation, type) pairs are computed once here
+_RANDBATS_FORMAT_META = {
+    fmt: (_extract_generation(fmt), _extract_randbats_type(fmt)) for fmt in RANDBATS_FORMATS
+}
+_SMOGON_FORMAT_META = {
+    fmt: (_extract_generation(fmt), _extract_smogon_type(fmt)) for fmt in SMOGON_FORMATS
+}
@@ -2,12 +2,12 @@
 Smogon competitive sets data management.
 """
 
-import os
-import json
+import sys
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
-from datetime import datetime
+from typing import Dict, List, Optional, Any
+from .formats import _normalize_name
+from .updater import DataReader
 
 logger = logging.getLogger(__name__)
 
@@ -19,21 +19,25 @@ class SmogonSets:
     This data is bundled at build time and does not require runtime updates.
     """
     
-    def __init__(self, formats: Optional[List[str]] = None):
+    def __init__(self, formats: Optional[List[str]] = None, cache_dir: Optional[Path] = None):
         """
         Initialize SmogonSets instance.
         
         Args:
             formats: List of format names to load. If None, loads all available.
+            cache_dir: Directory to store pickled copies of parsed data files. If None, nothing is cached.
         """
         self.formats = formats or []
         self._data: Dict[str, Dict] = {}
         self._loaded_formats: set = set()
+        # Normalized Pokemon name -> {format: sets}, built as formats load
+        self._index: Dict[str, Dict[str, Dict]] = {}
+        self._reader = DataReader(Path(__file__).parent / "smogon_data", cache_dir)
         
         # Load data
         self._load_data()
     
-    def _load_data(self):
+    def _load_data(self) -> None:
         """Load data for all specified formats."""
         if not self.formats:
             # Load all available formats
@@ -43,24 +47,24 @@ class SmogonSets:
             if format_name not in self._loaded_formats:
                 self._load_format(format_name)
     
-    def _discover_formats(self):
+    def _discover_formats(self) -> None:
         """Discover available Smogon formats from bundled data."""
-        data_dir = Path(__file__).parent / "smogon_data"
-        if data_dir.exists():
-            for file_path in data_dir.glob("*.json"):
-                format_name = file_path.stem
-                if format_name not in self.formats:
-                    self.formats.append(format_name)
-    
-    def _load_format(self, format_name: str):
+        # glob() yields nothing for a missing directory, so no exists() check is needed
+        data_dir = self._reader.data_dir
+        for file_path in [*data_dir.glob("*.json"), *data_dir.glob("*.json.gz")]:
+            format_name = file_path.name.split(".", 1)[0]
+            if format_name not in self.formats:
+                self.formats.append(format_name)
+    
+    def _load_format(self, format_name: str) -> None:
         """Load data for a specific format."""
         try:
             # Load from bundled data
-            bundled_file = Path(__file__).parent / "smogon_data" / f"{format_name}.json"
-            if bundled_file.exists():
-                with open(bundled_file, 'r', encoding='utf-8') as f:
-                    self._data[format_name] = json.load(f)
+            data = self._reader.get_format_data(format_name)
+            if data is not None:
+                self._data[format_name] = data
                 self._loaded_formats.add(format_name)
+                self._index_format(format_name)
                 logger.debug(f"Loaded {format_name} from bundled data")
                 return
             
@@ -74,6 +78,15 @@ class SmogonSets:
             self._data[format_name] = {}
             self._loaded_formats.add(format_name)
     
+    def _index_format(self, format_name: str) -> None:
+        """Add a format's Pokemon to the normalized-name index used for lookups."""
+        for key, sets in self._data[format_name].items():
+            name = sys.intern(self._normalize_name(key))
+            formats = self._index.setdefault(name, {})
+            # An exact normalized key wins over a fuzzy match, as in get_sets
+            if key == name or format_name not in formats:
+                formats[format_name] = sets
+    
     def get_sets(self, pokemon_name: str, format_name: str) -> Optional[Dict[str, Any]]:
         """
         Get all sets for a Pokemon in a specific format.
@@ -89,20 +102,9 @@ class SmogonSets:
             logger.warning(f"Format {format_name} not available")
             return None
         
-        # Normalize Pokemon name
-        pokemon_name = self._normalize_name(pokemon_name)
-        
-        # Search in format data
-        format_data = self._data[format_name]
-        if pokemon_name in format_data:
-            return format_data[pokemon_name]
-        
-        # Try fuzzy matching
-        for key in format_data.keys():
-            if self._normalize_name(key) == pokemon_name:
-                return format_data[key]
-        
-        return None
+        # Names were normalized once at load time, so this is a single lookup
+        name = self._normalize_name(pokemon_name)
+        return self._index.get(name, {}).get(format_name)
     
     def get_set(self, pokemon_name: str, format_name: str, set_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -167,12 +169,8 @@ class SmogonSets:
         Returns:
             Dictionary mapping format names to Pokemon sets
         """
-        results = {}
-        for format_name in self._loaded_formats:
-            sets = self.get_sets(pokemon_name, format_name)
-            if sets:
-                results[format_name] = sets
-        return results
+        name = self._normalize_name(pokemon_name)
+        return {fmt: sets for fmt, sets in self._index.get(name, {}).items() if sets}
     
     def _normalize_name(self, name: str) -> str:
         """
@@ -184,8 +182,7 @@ class SmogonSets:
         Returns:
             Normalized name
         """
-        # Remove all non-alphanumeric characters and convert to lowercase
-        return ''.join(c for c in name.lower() if c.isalnum())
+        return _normalize_name(name)
     
     def get_format_info(self, format_name: str) -> Dict[str, Any]:
         """
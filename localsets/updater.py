@@ -2,26 +2,113 @@
 Data reader for Pokemon random battle data (offline only).
 """
 
+import gzip
 import json
 import logging
+import mmap
+import os
+import pickle
+import sys
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple
 
 from .formats import FORMATS
 
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:  # optional, installed with the 'fast' extra
+    _HAS_ORJSON = False
+
 logger = logging.getLogger(__name__)
 
+
+def _loads(raw: bytes) -> Any:
+    """Parse JSON bytes, using orjson when it is installed."""
+    if _HAS_ORJSON:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _read_json_file(path: Path) -> Any:
+    """Parse a .json or gzip-compressed .json.gz file."""
+    if path.suffix == '.gz':
+        return _loads(gzip.decompress(path.read_bytes()))
+    if _HAS_ORJSON:
+        with open(path, 'rb') as f:
+            # An empty file cannot be mapped; parse it so it fails as invalid JSON
+            if os.fstat(f.fileno()).st_size == 0:
+                return _loads(b'')
+            # orjson parses straight from the mapped pages, with no bytes copy of the file
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+    return _loads(path.read_bytes())
+
+def _intern_values(obj: Any) -> Any:
+    """Intern the string values in parsed JSON in place, so repeated names share one object.
+
+    Keys are left alone: both parsers already share repeated keys within a document.
+    """
+    items = obj.items() if type(obj) is dict else enumerate(obj)
+    for key, value in items:
+        kind = type(value)
+        if kind is str:
+            obj[key] = sys.intern(value)
+        elif kind is dict or kind is list:
+            _intern_values(value)
+    return obj
+
 class DataReader:
     """
     Handles reading Pokemon random battle data from local files only.
     """
-    def __init__(self, data_dir: Path):
+    def __init__(self, data_dir: Path, cache_dir: Optional[Path] = None):
         """
         Initialize DataReader.
         Args:
             data_dir: Directory containing local data files
+            cache_dir: Directory for pickled copies of parsed files. If None, no cache is kept.
         """
         self.data_dir = data_dir
+        self.cache_dir = cache_dir / data_dir.name if cache_dir else None
+
+    def _source_files(self, name: str) -> Tuple[Path, Path]:
+        """Return the candidate files for name: plain JSON first, then a .json.gz copy."""
+        return self.data_dir / f"{name}.json", self.data_dir / f"{name}.json.gz"
+
+    def _stat_source(self, name: str) -> Optional[Tuple[Path, os.stat_result]]:
+        """Return the first existing file for name and its stat, or None if there is none."""
+        for path in self._source_files(name):
+            try:
+                return path, path.stat()
+            except FileNotFoundError:
+                continue
+        return None
+
+    def _read_cache(self, format_name: str, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        """Return the pickled copy of a format if it was built from the file described by stat."""
+        if self.cache_dir is None:
+            return None
+        try:
+            cached: Tuple[int, int, Dict[str, Any]] = pickle.loads((self.cache_dir / f"{format_name}.pkl").read_bytes())
+            mtime_ns, size, data = cached
+            if (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size):
+                return data
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable cache for {format_name}: {e}")
+        return None
+
+    def _write_cache(self, format_name: str, stat: os.stat_result, data: Dict[str, Any]) -> None:
+        """Store a pickled copy of data tagged with the source file's mtime and size."""
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            payload = pickle.dumps((stat.st_mtime_ns, stat.st_size, data), protocol=pickle.HIGHEST_PROTOCOL)
+            (self.cache_dir / f"{format_name}.pkl").write_bytes(payload)
+        except Exception as e:
+            logger.warning(f"Failed to write cache for {format_name}: {e}")
 
     def get_format_data(self, format_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -31,16 +118,22 @@ class DataReader:
         Returns:
             Data dictionary, or None if not found
         """
-        data_file = self.data_dir / f"{format_name}.json"
-        if not data_file.exists():
-            logger.warning(f"Data file not found: {data_file}")
+        # Stat before reading so a file changed mid-read is re-parsed next time
+        source = self._stat_source(format_name)
+        if source is None:
+            logger.warning(f"Data file not found: {self._source_files(format_name)[0]}")
             return None
+        data_file, stat = source
+        cached = self._read_cache(format_name, stat)
+        if cached is not None:
+            return cached
         try:
-            with open(data_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            data = _intern_values(_read_json_file(data_file))
         except Exception as e:
             logger.error(f"Failed to read data for {format_name}: {e}")
             return None
+        self._write_cache(format_name, stat, data)
+        return data
 
     def get_metadata(self, format_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -50,15 +143,16 @@ class DataReader:
         Returns:
             Metadata dictionary, or None if not found
         """
-        metadata_file = self.data_dir / f"{format_name}_metadata.json"
-        if not metadata_file.exists():
-            logger.warning(f"Metadata file not found: {metadata_file}")
-            return None
-        try:
-            with open(metadata_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to read metadata for {format_name}: {e}")
-            return None
+        candidates = self._source_files(f"{format_name}_metadata")
+        for metadata_file in candidates:
+            try:
+                return _read_json_file(metadata_file)
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.error(f"Failed to read metadata for {format_name}: {e}")
+                return None
+        logger.warning(f"Metadata file not found: {candidates[0]}")
+        return None
 
 __all__ = ['DataReader'] 
\ No newline at end of file
@@ -1,13 +1,28 @@
-import os
 import json
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional, installed with the 'fast' extra
+    orjson = None
+
 GITHUB_RAW_BASE = "https://raw.githubusercontent.com/pkmn/randbats/main/data"
 GITHUB_STATS_BASE = "https://raw.githubusercontent.com/pkmn/randbats/main/data/stats"
 GITHUB_API_BASE = "https://api.github.com/repos/pkmn/randbats/contents/data"
 SMOGON_BASE_URL = "https://pkmn.github.io/smogon/data/sets"
 
+# Downloads are network-bound, so formats are fetched concurrently
+MAX_WORKERS = 8
+REQUEST_TIMEOUT = 30
+
+# ETags from the last successful download of each URL, sent back as If-None-Match
+ETAG_FILE = Path("scripts/etags.json")
+
 RANDBATS_FORMATS = [
     "gen1randombattle", "gen2randombattle", "gen3randombattle", "gen4randombattle", "gen5randombattle", "gen6randombattle",
     "gen7letsgorandombattle", "gen7randombattle", "gen8bdsprandombattle", "gen8randombattle", "gen8randomdoublesbattle",
@@ -26,132 +41,256 @@ SMOGON_FORMATS = [
     "gen1ou", "gen1uu", "gen1nu", "gen1pu", "gen1ubers", "gen1doublesou"
 ]
 
-def ensure_dir(path):
-    os.makedirs(path, exist_ok=True)
+def loads(raw):
+    """Parse JSON bytes, using orjson when it is installed.
+
+    Files are still written with json.dump so their bytes do not depend on which parser ran.
+    """
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def make_session():
+    """Create a session that keeps connections alive and retries transient failures."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS * 2, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# One pooled session is shared by all workers so TLS connections are reused
+SESSION = make_session()
 
 def load_existing_data(file_path):
     """Load existing data from file if it exists, return empty dict if not"""
-    if file_path.exists():
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError) as e:
-            print(f"[WARN] Failed to load existing data from {file_path}: {e}")
+    try:
+        return loads(file_path.read_bytes())
+    except FileNotFoundError:
+        pass
+    except (ValueError, OSError) as e:
+        print(f"[WARN] Failed to load existing data from {file_path}: {e}")
     return {}
 
-def download_randbats():
-    data_dir = Path("localsets/randbattle_data")
-    metadata_dir = Path("localsets/metadata")
-    ensure_dir(data_dir)
-    ensure_dir(metadata_dir)
+def save_etags(etags):
+    with open(ETAG_FILE, 'w', encoding='utf-8') as f:
+        json.dump(etags, f, indent=2, sort_keys=True)
+
+def conditional_get(url, etags, have_valid_copy, stream=False):
+    """GET url, asking for 304 Not Modified only while a valid local copy matches the stored ETag.
+
+    have_valid_copy must mean the local file parsed to a non-empty document, so a corrupt
+    or truncated file is always downloaded again rather than kept by a 304.
+    """
+    headers = {}
+    if url in etags and have_valid_copy:
+        headers["If-None-Match"] = etags[url]
+    return SESSION.get(url, headers=headers, timeout=REQUEST_TIMEOUT, stream=stream)
+
+def stream_to_file(response, path, chunk_size=65536):
+    """Write a streamed response body to path in chunks, replacing it only once complete."""
+    partial = path.with_name(path.name + ".part")
+    try:
+        with open(partial, 'wb') as f:
+            for chunk in response.iter_content(chunk_size):
+                f.write(chunk)
+        partial.replace(path)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+def remember_etag(etags, url, response):
+    etag = response.headers.get("ETag")
+    if etag:
+        etags[url] = etag
+    else:
+        etags.pop(url, None)
+
+def fetch_metadata_listing():
+    """Return the upstream data directory listing as {file name: entry}, or {} if unavailable."""
+    try:
+        response = SESSION.get(GITHUB_API_BASE, timeout=REQUEST_TIMEOUT)
+        if response.status_code == 200:
+            return {entry["name"]: entry for entry in loads(response.content) if "name" in entry}
+        print(f"[WARN] Metadata listing not available (HTTP {response.status_code})")
+    except Exception as e:
+        print(f"[WARN] Failed to download metadata listing: {e}")
+    return {}
+
+def download_randbats_format(format_name, data_dir, metadata_dir, etags, listing):
+    """Update one RandBats format and return its log lines."""
+    messages = []
+    log = messages.append
+    data_url = f"{GITHUB_RAW_BASE}/{format_name}.json"
+    stats_url = f"{GITHUB_STATS_BASE}/{format_name}.json"
+    data_file = data_dir / f"{format_name}.json"
+    metadata_url = f"{GITHUB_API_BASE}/{format_name}.json"
+    metadata_file = metadata_dir / f"{format_name}_metadata.json"
     
-    for format_name in RANDBATS_FORMATS:
-        data_url = f"{GITHUB_RAW_BASE}/{format_name}.json"
-        stats_url = f"{GITHUB_STATS_BASE}/{format_name}.json"
-        data_file = data_dir / f"{format_name}.json"
-        metadata_url = f"{GITHUB_API_BASE}/{format_name}.json"
-        metadata_file = metadata_dir / f"{format_name}_metadata.json"
-        
-        # Load existing data as backup
-        existing_data = load_existing_data(data_file)
+    # Load existing data as backup
+    existing_data = load_existing_data(data_file)
+    
+    try:
+        log(f"Downloading {format_name}.json...")
         
+        # Ask for both halves of the merged file; skip the rewrite if neither changed
+        response = conditional_get(data_url, etags, bool(existing_data))
         try:
-            print(f"Downloading {format_name}.json...")
-            
-            # Download set data
-            with urllib.request.urlopen(data_url) as response:
-                if response.status != 200:
-                    raise Exception(f"HTTP {response.status}: {response.reason}")
-                set_data = json.loads(response.read().decode())
+            stats_response = conditional_get(stats_url, etags, bool(existing_data))
+        except Exception as stats_e:
+            stats_response = None
+            log(f"[WARN] No stats for {format_name}: {stats_e}")
+        
+        if response.status_code == 304 and stats_response is not None and stats_response.status_code == 304:
+            log(f"[OK] {format_name}.json unchanged")
+        else:
+            # Merging needs both bodies, so refetch a half that came back unmodified
+            if response.status_code == 304:
+                response = SESSION.get(data_url, timeout=REQUEST_TIMEOUT)
+            if response.status_code != 200:
+                raise Exception(f"HTTP {response.status_code}: {response.reason}")
+            set_data = loads(response.content)
             
-            # Download stats data (optional)
-            try:
-                with urllib.request.urlopen(stats_url) as stats_response:
-                    if stats_response.status == 200:
-                        stats_data = json.loads(stats_response.read().decode())
+            # Merge stats data (optional)
+            if stats_response is not None:
+                try:
+                    if stats_response.status_code == 304:
+                        stats_response = SESSION.get(stats_url, timeout=REQUEST_TIMEOUT)
+                    if stats_response.status_code == 200:
+                        stats_data = loads(stats_response.content)
                         # Merge stats into each set
                         for poke, poke_stats in stats_data.items():
                             if poke in set_data:
                                 set_data[poke]["stats"] = poke_stats
-                        print(f"[OK] Downloaded stats for {format_name}")
+                        log(f"[OK] Downloaded stats for {format_name}")
                     else:
-                        print(f"[WARN] Stats not available for {format_name} (HTTP {stats_response.status})")
-            except Exception as stats_e:
-                print(f"[WARN] No stats for {format_name}: {stats_e}")
+                        log(f"[WARN] Stats not available for {format_name} (HTTP {stats_response.status_code})")
+                except Exception as stats_e:
+                    stats_response = None
+                    log(f"[WARN] No stats for {format_name}: {stats_e}")
             
             # Save merged data
             with open(data_file, 'w', encoding='utf-8') as f:
                 json.dump(set_data, f, indent=2)
-            
-            # Download and save metadata
-            try:
-                with urllib.request.urlopen(metadata_url) as response:
-                    if response.status == 200:
-                        metadata = json.loads(response.read().decode())
-                        with open(metadata_file, 'w', encoding='utf-8') as f:
-                            json.dump(metadata, f, indent=2)
-                        print(f"[OK] Downloaded metadata for {format_name}")
-                    else:
-                        print(f"[WARN] Metadata not available for {format_name} (HTTP {response.status})")
-            except Exception as metadata_e:
-                print(f"[WARN] Failed to download metadata for {format_name}: {metadata_e}")
-            
-            print(f"[OK] Downloaded {format_name}.json")
-            
-        except Exception as e:
-            print(f"[ERROR] Failed to download {format_name}.json: {e}")
-            print(f"[INFO] Preserving existing data for {format_name}")
-            
-            # Only write empty data if we don't have existing data
-            if not existing_data:
-                print(f"[WARN] No existing data found for {format_name}, creating empty file")
-                with open(data_file, 'w', encoding='utf-8') as f:
-                    json.dump({}, f)
+            remember_etag(etags, data_url, response)
+            if stats_response is not None and stats_response.status_code == 200:
+                remember_etag(etags, stats_url, stats_response)
             else:
-                print(f"[INFO] Keeping existing data for {format_name} ({len(existing_data)} entries)")
-                # Verify the existing data is still valid and not empty
-                if len(existing_data) == 0:
-                    print(f"[WARN] Existing data for {format_name} is empty, but keeping it to avoid data loss")
-
-def download_smogon():
-    smogon_data_dir = Path("localsets/smogon_data")
-    ensure_dir(smogon_data_dir)
-    for format_name in SMOGON_FORMATS:
-        data_url = f"{SMOGON_BASE_URL}/{format_name}.json"
-        data_file = smogon_data_dir / f"{format_name}.json"
-        
-        # Load existing data as backup
-        existing_data = load_existing_data(data_file)
+                etags.pop(stats_url, None)
+            log(f"[OK] Downloaded {format_name}.json")
         
+        # Download and save metadata, unless the listing shows the stored copy is current
         try:
-            print(f"Downloading {format_name}.json...")
-            with urllib.request.urlopen(data_url) as response:
-                if response.status == 200:
-                    with open(data_file, 'wb') as f:
-                        f.write(response.read())
-                    print(f"[OK] Downloaded {format_name}.json")
-                else:
-                    print(f"[ERROR] {format_name}.json not available (HTTP {response.status})")
-                    # Preserve existing data if download fails
-                    if existing_data:
-                        print(f"[INFO] Preserving existing data for {format_name} ({len(existing_data)} entries)")
-                    else:
-                        print(f"[WARN] No existing data found for {format_name}")
-        except Exception as e:
-            print(f"[ERROR] Failed to download {format_name}.json: {e}")
-            # Preserve existing data if download fails
-            if existing_data:
-                print(f"[INFO] Preserving existing data for {format_name} ({len(existing_data)} entries)")
+            existing_metadata = load_existing_data(metadata_file)
+            upstream = listing.get(f"{format_name}.json")
+            if upstream and existing_metadata and upstream.get("sha") == existing_metadata.get("sha"):
+                response = None
+            else:
+                response = conditional_get(metadata_url, etags, bool(existing_metadata))
+            if response is None or response.status_code == 304:
+                log(f"[OK] Metadata for {format_name} unchanged")
+            elif response.status_code == 200:
+                metadata = loads(response.content)
+                with open(metadata_file, 'w', encoding='utf-8') as f:
+                    json.dump(metadata, f, indent=2)
+                remember_etag(etags, metadata_url, response)
+                log(f"[OK] Downloaded metadata for {format_name}")
             else:
-                print(f"[WARN] No existing data found for {format_name}")
+                log(f"[WARN] Metadata not available for {format_name} (HTTP {response.status_code})")
+        except Exception as metadata_e:
+            log(f"[WARN] Failed to download metadata for {format_name}: {metadata_e}")
+        
+    except Exception as e:
+        log(f"[ERROR] Failed to download {format_name}.json: {e}")
+        log(f"[INFO] Preserving existing data for {format_name}")
+        
+        # Only write empty data if we don't have existing data
+        if not existing_data:
+            log(f"[WARN] No existing data found for {format_name}, creating empty file")
+            with open(data_file, 'w', encoding='utf-8') as f:
+                json.dump({}, f)
+        else:
+            log(f"[INFO] Keeping existing data for {format_name} ({len(existing_data)} entries)")
+            # Verify the existing data is still valid and not empty
+            if len(existing_data) == 0:
+                log(f"[WARN] Existing data for {format_name} is empty, but keeping it to avoid data loss")
+    return messages
+
+def download_randbats(etags):
+    data_dir = Path("localsets/randbattle_data")
+    metadata_dir = Path("localsets/metadata")
+    data_dir.mkdir(parents=True, exist_ok=True)
+    metadata_dir.mkdir(parents=True, exist_ok=True)
+    # One directory listing instead of a contents API call per format when nothing changed
+    listing = fetch_metadata_listing()
+    
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(
+            lambda format_name: download_randbats_format(format_name, data_dir, metadata_dir, etags, listing),
+            RANDBATS_FORMATS,
+        )
+        # Print each format's messages together, in format order
+        for messages in results:
+            print("\n".join(messages))
+
+def download_smogon_format(format_name, smogon_data_dir, etags):
+    """Update one Smogon format and return its log lines."""
+    messages = []
+    log = messages.append
+    data_url = f"{SMOGON_BASE_URL}/{format_name}.json"
+    data_file = smogon_data_dir / f"{format_name}.json"
+    
+    # Load existing data as backup
+    existing_data = load_existing_data(data_file)
+    
+    try:
+        log(f"Downloading {format_name}.json...")
+        # Smogon files are saved verbatim, so the body goes straight to disk
+        with conditional_get(data_url, etags, bool(existing_data), stream=True) as response:
+            if response.status_code == 304:
+                log(f"[OK] {format_name}.json unchanged")
+            elif response.status_code == 200:
+                stream_to_file(response, data_file)
+                remember_etag(etags, data_url, response)
+                log(f"[OK] Downloaded {format_name}.json")
+            else:
+                log(f"[ERROR] {format_name}.json not available (HTTP {response.status_code})")
+                # Preserve existing data if download fails
+                if existing_data:
+                    log(f"[INFO] Preserving existing data for {format_name} ({len(existing_data)} entries)")
+                else:
+                    log(f"[WARN] No existing data found for {format_name}")
+    except Exception as e:
+        log(f"[ERROR] Failed to download {format_name}.json: {e}")
+        # Preserve existing data if download fails
+        if existing_data:
+            log(f"[INFO] Preserving existing data for {format_name} ({len(existing_data)} entries)")
+        else:
+            log(f"[WARN] No existing data found for {format_name}")
+    return messages
+
+def download_smogon(etags):
+    smogon_data_dir = Path("localsets/smogon_data")
+    smogon_data_dir.mkdir(parents=True, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        results = executor.map(
+            lambda format_name: download_smogon_format(format_name, smogon_data_dir, etags),
+            SMOGON_FORMATS,
+        )
+        # Print each format's messages together, in format order
+        for messages in results:
+            print("\n".join(messages))
 
 def main():
     print("Starting data update process...")
     print("=" * 50)
     
-    download_randbats()
+    # Workers only ever touch their own URLs' entries, so one dict is shared
+    etags = load_existing_data(ETAG_FILE)
+    download_randbats(etags)
     print("-" * 30)
-    download_smogon()
+    download_smogon(etags)
+    save_etags(etags)
     
     print("=" * 50)
     print("All data update complete!")